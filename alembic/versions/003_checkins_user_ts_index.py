@@ -0,0 +1,34 @@
+"""Composite (user_id, ts) index on checkins
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+"""
+
+from alembic import op
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # /check-in reads a user's history ordered by ts; one composite index serves both the
+    # filter and the ORDER BY, and makes the single-column user_id index a redundant prefix.
+    # checkins is the largest table, so on Postgres build/drop CONCURRENTLY (outside the
+    # migration transaction) instead of holding a lock that blocks check-in writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_checkins_user_ts", "checkins", ["user_id", "ts"], postgresql_concurrently=True
+        )
+        op.drop_index("ix_checkins_user_id", table_name="checkins", postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_checkins_user_id", "checkins", ["user_id"], postgresql_concurrently=True
+        )
+        op.drop_index("ix_checkins_user_ts", table_name="checkins", postgresql_concurrently=True)
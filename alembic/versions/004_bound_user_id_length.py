@@ -0,0 +1,41 @@
+"""Bound user_id columns to VARCHAR(64)
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Matches the API's new max_length. On Postgres the ALTER fails if any existing user_id
+    # is longer than 64 characters; shorten or remove such rows before upgrading.
+    # batch_alter_table issues a plain ALTER on Postgres and a table copy on SQLite.
+    for table in ("consents", "checkins"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "user_id",
+                existing_type=sa.String(),
+                type_=sa.String(length=64),
+                existing_nullable=False,
+            )
+
+
+def downgrade() -> None:
+    for table in ("checkins", "consents"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "user_id",
+                existing_type=sa.String(length=64),
+                type_=sa.String(),
+                existing_nullable=False,
+            )
@@ -1,43 +1,129 @@
 from __future__ import annotations
 
+import asyncio
 import time
 from typing import Any, Dict, Optional
 
 import httpx
+import orjson
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from jose.exceptions import JWKError
 
 from app.settings import settings
 
 security = HTTPBearer(auto_error=False)
 
+# Shared across JWKS refreshes so keep-alive connections and TLS sessions are reused.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=5.0, limits=httpx.Limits(max_keepalive_connections=10)
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 class JWTValidator:
     def __init__(self):
         self._public_keys: Optional[Dict[str, Any]] = None
+        # kid -> constructed jose key; avoids re-parsing the JWK on every token.
+        self._key_objects: Dict[str, Any] = {}
         self._keys_cached_at: float = 0.0
+        # When the last JWKS fetch failed; no new fetch is attempted for the backoff period.
+        self._refresh_failed_at: float = 0.0
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task[None]] = None
 
-    async def get_public_keys(self) -> Dict[str, Any]:
-        now = time.time()
-        cache_age = now - self._keys_cached_at
+    def _keys_age(self) -> float:
+        return time.time() - self._keys_cached_at
 
-        if self._public_keys is not None and cache_age < settings.jwt_keys_cache_ttl:
-            return self._public_keys
+    def _keys_fresh(self) -> bool:
+        return self._public_keys is not None and self._keys_age() < settings.jwt_keys_cache_ttl
+
+    def _refresh_backing_off(self) -> bool:
+        return time.time() - self._refresh_failed_at < settings.jwt_keys_refresh_backoff
+
+    async def get_public_keys(self) -> Dict[str, Any]:
+        """
+        Return the cached JWKS, fetching it only when nothing usable is cached.
+
+        Once keys are cached, an expired TTL schedules a single background revalidation and
+        the stale keys keep being served. Past jwt_keys_max_stale (e.g. the JWKS endpoint
+        has been failing), stale keys are no longer trusted: the caller waits for a refresh
+        and gets no keys (503) if it fails. After a failed fetch no new one is started for
+        jwt_keys_refresh_backoff seconds, so an IdP outage is not retried on every request.
+        """
+        if self._public_keys is not None:
+            if self._keys_fresh():
+                return self._public_keys
+            if self._keys_age() < settings.jwt_keys_max_stale:
+                if not self._refresh_backing_off() and (
+                    self._refresh_task is None or self._refresh_task.done()
+                ):
+                    self._refresh_task = asyncio.create_task(self._refresh())
+                return self._public_keys
 
         if not settings.jwt_public_keys_url:
             return {}
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(str(settings.jwt_public_keys_url))
+        await self._refresh()
+        if not self._keys_fresh():
+            return {}
+        return self._public_keys or {}
+
+    async def _refresh(self) -> None:
+        async with self._refresh_lock:
+            # Another coroutine may have refreshed, or failed to, while we waited for the lock.
+            if self._keys_fresh() or self._refresh_backing_off():
+                return
+
+            headers: Dict[str, str] = {}
+            if self._public_keys is not None:
+                if self._etag:
+                    headers["If-None-Match"] = self._etag
+                if self._last_modified:
+                    headers["If-Modified-Since"] = self._last_modified
+
+            try:
+                response = await get_http_client().get(
+                    str(settings.jwt_public_keys_url), headers=headers
+                )
+                if response.status_code == status.HTTP_304_NOT_MODIFIED:
+                    self._keys_cached_at = time.time()
+                    return
                 response.raise_for_status()
-                jwks = response.json()
+                jwks = orjson.loads(response.content)
                 self._public_keys = {key["kid"]: key for key in jwks.get("keys", [])}
-                self._keys_cached_at = now
-                return self._public_keys
-        except Exception:
-            return {}
+                self._key_objects = {}
+                self._etag = response.headers.get("etag")
+                self._last_modified = response.headers.get("last-modified")
+                self._keys_cached_at = time.time()
+            except Exception:
+                # Keep serving whatever keys we already have; the first expired read after
+                # the backoff retries.
+                self._refresh_failed_at = time.time()
+                return
+
+    def _key_object(self, kid: str, key: Dict[str, Any]) -> Any:
+        key_object = self._key_objects.get(kid)
+        if key_object is None:
+            key_object = jwk.construct(key, settings.jwt_algorithm)
+            self._key_objects[kid] = key_object
+        return key_object
 
     async def validate_token(self, token: str) -> Dict[str, Any]:
         try:
@@ -52,17 +138,24 @@ class JWTValidator:
                 )
 
             key = keys.get(kid)
+            if not key and not self._keys_fresh():
+                # The signer may have rotated keys; wait for the (single-flight) refresh once.
+                await self._refresh()
+                key = (self._public_keys or {}).get(kid)
             if not key:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token: unknown key ID"
                 )
 
             payload = jwt.decode(
-                token, key, algorithms=[settings.jwt_algorithm], options={"verify_aud": False}
+                token,
+                self._key_object(kid, key),
+                algorithms=[settings.jwt_algorithm],
+                options={"verify_aud": False},
             )
             return payload
 
-        except JWTError as e:
+        except (JWTError, JWKError) as e:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid token: {str(e)}"
             )
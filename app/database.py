@@ -1,12 +1,44 @@
 import os
-from typing import Any, Dict, Optional
-
-from sqlalchemy import Boolean, Column, Float, Integer, MetaData, String, Table, create_engine
-from sqlalchemy.engine import Engine
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    event,
+)
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import sessionmaker
 
 from app.settings import settings
 
+# Per-connection SQLite tuning. WAL lets readers proceed while a write is in flight;
+# synchronous=NORMAL under WAL can lose the last commits on power loss but never corrupts
+# the file; a 64 MiB page cache plus 256 MiB mmap keep the working set out of read() calls.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 
 class _LazyEngine:
     """Lazy engine wrapper that defers initialization until first access."""
@@ -29,10 +61,17 @@ class _LazyEngine:
         else:
             engine_kwargs["pool_size"] = settings.db_pool_size
             engine_kwargs["max_overflow"] = settings.db_max_overflow
+            engine_kwargs["pool_timeout"] = settings.db_pool_timeout
+            engine_kwargs["pool_recycle"] = settings.db_pool_recycle
+            engine_kwargs["pool_pre_ping"] = settings.db_pool_pre_ping
+            # LIFO keeps a small hot set of connections busy so idle overflow ones can expire.
+            engine_kwargs["pool_use_lifo"] = settings.db_pool_use_lifo
 
         engine_kwargs["connect_args"] = connect_args
 
         self._engine = create_engine(database_url, **engine_kwargs)
+        if database_url.startswith("sqlite"):
+            event.listen(self._engine, "connect", _set_sqlite_pragmas)
         SessionLocal.configure(bind=self._engine)
 
         return self._engine
@@ -47,10 +86,13 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 metadata = MetaData()
 
+# Bounded so user_id indexes stay compact; request models enforce the same limit.
+USER_ID_MAX_LENGTH = 64
+
 consents_table = Table(
     "consents",
     metadata,
-    Column("user_id", String, primary_key=True),
+    Column("user_id", String(USER_ID_MAX_LENGTH), primary_key=True),
     Column("terms_version", String, nullable=False),
     Column("accepted", Boolean, nullable=False),
     Column("recorded_at", String, nullable=False),
@@ -60,7 +102,7 @@ checkins_table = Table(
     "checkins",
     metadata,
     Column("id", Integer, primary_key=True, autoincrement=True),
-    Column("user_id", String, nullable=False),
+    Column("user_id", String(USER_ID_MAX_LENGTH), nullable=False),
     Column("adherence", Integer, nullable=False),
     Column("mood_trend", Integer, nullable=False),
     Column("cravings", Integer, nullable=False),
@@ -68,6 +110,8 @@ checkins_table = Table(
     Column("isolation", Integer, nullable=False),
     Column("ts", String, nullable=False),
 )
+Index("ix_checkins_user_ts", checkins_table.c.user_id, checkins_table.c.ts)
+Index("ix_checkins_ts", checkins_table.c.ts)
 
 
 def create_tables():
@@ -75,6 +119,35 @@ def create_tables():
     metadata.create_all(bind=engine)
 
 
+def prewarm_pool() -> int:
+    """
+    Open db_pool_size connections in parallel, ping each, and return them to the pool.
+
+    Moves TCP/TLS/auth handshakes off the first burst of real traffic. SQLite has no network
+    handshake to amortize, so it is skipped. Returns the number of connections warmed.
+    """
+    if engine.dialect.name == "sqlite":
+        return 0
+
+    size = settings.db_pool_size
+    conns: List[Connection] = []
+
+    def _open(_: int) -> None:
+        conn = engine.connect()
+        conns.append(conn)
+        conn.exec_driver_sql("SELECT 1")
+
+    try:
+        # All connections stay checked out until every worker finishes, so the pool has to
+        # create `size` distinct connections rather than handing one back and forth.
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            list(executor.map(_open, range(size)))
+    finally:
+        for conn in conns:
+            conn.close()
+    return len(conns)
+
+
 def get_db():
     db = SessionLocal()
     try:
@@ -1,36 +1,56 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+import copy
 import hashlib
-import json
 import logging
+import logging.handlers
+import queue
 import shutil
 import subprocess
 import time
-from collections import defaultdict, deque
+from array import array
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
+from types import MappingProxyType
 from typing import (
+    Any,
     Awaitable,
     Callable,
-    Deque,
     Dict,
     Generator,
     List,
     Literal,
+    Mapping,
     Optional,
+    Sequence,
     Tuple,
     TypedDict,
 )
 
+import orjson
 from fastapi import Depends, FastAPI, Request, Response, status
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import func, insert, select
+from sqlalchemy import Row, bindparam, func, insert, select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import Response as StarletteResponse
 
-from app.database import SessionLocal, checkins_table, consents_table, create_tables
+from app.auth import close_http_client
+from app.database import (
+    USER_ID_MAX_LENGTH,
+    SessionLocal,
+    checkins_table,
+    consents_table,
+    create_tables,
+    prewarm_pool,
+)
 from app.settings import settings
 from app.users import router as users_router
 
@@ -46,13 +66,36 @@ try:
 except ImportError:
     OTEL_AVAILABLE = False
 
-APP_START_TS = time.time()
+try:
+    import redis.asyncio as redis_asyncio
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Monotonic so uptime never jumps or goes negative when the wall clock is stepped.
+APP_START_TS = time.monotonic()
 
 MAX_ERROR_MESSAGE_LENGTH = 100
 
 
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") swapped as one tuple so threads never see a torn pair.
+_iso_cache: Tuple[int, str] = (-1, "")
+
+
 def iso_now() -> str:
-    return datetime.now(timezone.utc).isoformat()
+    """
+    UTC ISO-8601 timestamp with microseconds; the date part is formatted once per second.
+    Unlike datetime.isoformat(), ".000000" is kept on exact seconds so stored ts strings
+    always have the same width and sort chronologically.
+    """
+    global _iso_cache
+    second, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_second, prefix = _iso_cache
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _iso_cache = (second, prefix)
+    return f"{prefix}.{nanos // 1000:06d}+00:00"
 
 
 if settings.sentry_dsn and settings.log_stacks_to_sentry:
@@ -67,56 +110,271 @@ if settings.sentry_dsn and settings.log_stacks_to_sentry:
 class JsonFormatter(logging.Formatter):
     """
     Security-hardened JSON log formatter.
-    - Emits compact JSON with ts/level/logger/msg.
+    - Emits compact JSON with ts/level/logger/msg, plus any fields passed as
+      ``extra={"extra_json": {...}}`` (serialized once, on the listener thread).
     - Intentionally omits stack traces/exception text (exc_info) to prevent PHI/PII leakage.
     - If stack capture is needed, enable Sentry via env (see flags above).
     """
 
+    # (epoch second, "YYYY-MM-DDTHH:MM:SS") swapped as one tuple so threads never see a torn pair.
+    _ts_cache: Tuple[int, str] = (-1, "")
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        cached_second, prefix = self._ts_cache
+        if second != cached_second:
+            prefix = datetime.fromtimestamp(second, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+            self._ts_cache = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}+00:00"
+
     def format(self, record: logging.LogRecord) -> str:
         payload = {
-            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "ts": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "msg": record.getMessage(),
         }
+        extra = record.__dict__.get("extra_json")
+        if extra:
+            payload.update({k: v for k, v in extra.items() if k not in payload})
         # DO NOT serialize record.exc_info or "Traceback" text into structured logs.
-        return json.dumps(payload, separators=(",", ":"))
+        return orjson.dumps(payload).decode()
+
+
+class _RedactingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never renders exception or stack text into the queued record.
+    The stock prepare() runs a default Formatter first, which appends the traceback to
+    record.msg before clearing exc_info; this only merges the message arguments.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        return record
 
 
 logger = logging.getLogger("app")
 _handler = logging.StreamHandler()
 _handler.setFormatter(JsonFormatter())
+# Request paths only enqueue the record; JSON formatting and the stream write happen on the
+# listener's thread. _RedactingQueueHandler drops exc_info, matching JsonFormatter's policy.
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, _handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger.setLevel(logging.INFO)
-logger.handlers = [_handler]
+logger.handlers = [_RedactingQueueHandler(_log_queue)]
 
-# Note: we intentionally do NOT touch Uvicorn access logs here;
-# Ensure deployment config avoids IP/UA in sinks.
+# Note: we intentionally do NOT touch Uvicorn access logs here; the container entrypoint
+# runs uvicorn with --no-access-log so client IPs never reach the log sinks.
 
 
 @dataclass
 class RateLimitConfig:
     capacity: int = 5
     window_seconds: int = 10
+    max_keys: int = 65536
 
 
 class InMemoryRateLimiter:
+    """
+    Token bucket per key: up to `capacity` requests in a burst, refilled at
+    capacity / window_seconds tokens per second.
+
+    Each key owns a fixed two-slot array('q') of [millitokens, last_refill_ns] that is
+    updated in place. All refill math is integer: one millitoken accrues every
+    `_ns_per_millitoken` nanoseconds, and `last_refill_ns` only advances by whole
+    millitokens so the remainder carries over instead of being rounded away.
+
+    At most `max_keys` buckets are kept; the least recently used one is evicted first, so a
+    flood of one-off clients cannot grow memory between prune() sweeps or push out a busy key.
+    """
+
     def __init__(self, cfg: RateLimitConfig) -> None:
         self.cfg = cfg
-        self.hits: Dict[str, Deque[float]] = defaultdict(deque)
-
-    def allow(self, key: str, now: Optional[float] = None) -> bool:
-        now = now or time.time()
-        dq = self.hits[key]
-        cutoff = now - self.cfg.window_seconds
-        while dq and dq[0] < cutoff:
-            dq.popleft()
-        if len(dq) >= self.cfg.capacity:
+        self.buckets: OrderedDict[bytes, array[int]] = OrderedDict()
+        # Derived once from cfg so allow() and prune() do no per-call division or scaling.
+        self._capacity_mt = cfg.capacity * 1000
+        self._window_ns = cfg.window_seconds * 1_000_000_000
+        self._ns_per_millitoken = self._window_ns // self._capacity_mt
+
+    def allow(self, key: bytes, now_ns: int) -> bool:
+        """`now_ns` must come from time.monotonic_ns(); the caller reads the clock once."""
+        capacity_mt = self._capacity_mt
+        buckets = self.buckets
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.cfg.max_keys:
+                buckets.popitem(last=False)
+            buckets[key] = array("q", (capacity_mt - 1000, now_ns))
+            return True
+        buckets.move_to_end(key)
+        ns_per_mt = self._ns_per_millitoken
+        tokens = bucket[0] + (now_ns - bucket[1]) // ns_per_mt
+        if tokens >= capacity_mt:
+            tokens = capacity_mt
+            bucket[1] = now_ns
+        else:
+            bucket[1] += (tokens - bucket[0]) * ns_per_mt
+        if tokens < 1000:
+            bucket[0] = tokens
             return False
-        dq.append(now)
+        bucket[0] = tokens - 1000
         return True
 
+    def prune(self, now_ns: Optional[int] = None) -> int:
+        """
+        Drop buckets idle for a full window and return how many were removed.
+
+        After window_seconds a bucket has refilled to capacity, which is exactly the state a
+        new key starts in, so forgetting it cannot change any allow() decision.
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        cutoff = now_ns - self._window_ns
+        stale = [key for key, bucket in self.buckets.items() if bucket[1] <= cutoff]
+        for key in stale:
+            del self.buckets[key]
+        return len(stale)
+
+
+# Same bucket as InMemoryRateLimiter, evaluated atomically inside Redis. Time comes from
+# Redis TIME (microseconds) so every worker refills against one clock. Numbers are formatted
+# with %d before HSET because Lua's default number-to-string keeps only 14 digits.
+_TOKEN_BUCKET_LUA = """
+local capacity_mt = tonumber(ARGV[1])
+local us_per_mt = tonumber(ARGV[2])
+local ttl_ms = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'last')
+local tokens = tonumber(state[1])
+local last = tonumber(state[2])
+if tokens == nil or last == nil then
+  tokens = capacity_mt
+  last = now
+else
+  local refill = math.floor((now - last) / us_per_mt)
+  tokens = tokens + refill
+  if tokens >= capacity_mt then
+    tokens = capacity_mt
+    last = now
+  else
+    last = last + refill * us_per_mt
+  end
+end
+local allowed = 0
+if tokens >= 1000 then
+  tokens = tokens - 1000
+  allowed = 1
+end
+redis.call('HSET', KEYS[1],
+  'tokens', string.format('%d', tokens), 'last', string.format('%d', last))
+redis.call('PEXPIRE', KEYS[1], ttl_ms)
+return allowed
+"""
+
+
+class RedisRateLimiter:
+    """
+    Token bucket shared by every worker and replica, kept in Redis and updated by one
+    EVALSHA per check. Keys expire after a window, when a bucket would be full anyway.
+    After a failed call Redis is skipped until `retry_at_ns`, so an outage costs one
+    timeout per `retry_after_seconds` instead of one per request.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        cfg: RateLimitConfig,
+        prefix: bytes = b"ratelimit:",
+        retry_after_seconds: float = 5.0,
+    ) -> None:
+        self.cfg = cfg
+        self.retry_after_ns = int(retry_after_seconds * 1_000_000_000)
+        self.retry_at_ns = 0
+        self._client = client
+        self._script = client.register_script(_TOKEN_BUCKET_LUA)
+        self._prefix = prefix
+        capacity_mt = cfg.capacity * 1000
+        window_us = cfg.window_seconds * 1_000_000
+        self._args = (capacity_mt, window_us // capacity_mt, cfg.window_seconds * 1000)
+
+    async def allow(self, key: bytes) -> bool:
+        return bool(await self._script(keys=[self._prefix + key], args=self._args))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
 
 RATE_LIMIT = InMemoryRateLimiter(RateLimitConfig())
+RATE_LIMIT_SWEEP_INTERVAL_SECONDS = 60
+
+REDIS_RATE_LIMIT: Optional[RedisRateLimiter] = None
+if settings.rate_limit_redis_url:
+    if REDIS_AVAILABLE:
+        # redis-py has no socket timeouts by default; an unreachable host would stall every
+        # check-in for the OS TCP timeout before the in-process fallback kicks in.
+        REDIS_RATE_LIMIT = RedisRateLimiter(
+            redis_asyncio.from_url(
+                settings.rate_limit_redis_url.get_secret_value(),
+                socket_connect_timeout=settings.rate_limit_redis_timeout_seconds,
+                socket_timeout=settings.rate_limit_redis_timeout_seconds,
+            ),
+            RATE_LIMIT.cfg,
+            retry_after_seconds=settings.rate_limit_redis_retry_seconds,
+        )
+    else:
+        logger.warning(
+            "RATE_LIMIT_REDIS_URL is set but redis is not installed; limiting in-process"
+        )
+
+
+async def check_rate_limit(key: bytes, now_ns: int) -> bool:
+    redis_limiter = REDIS_RATE_LIMIT
+    if redis_limiter is not None and now_ns >= redis_limiter.retry_at_ns:
+        try:
+            return await redis_limiter.allow(key)
+        except Exception as e:
+            # Degrade to per-process limiting rather than failing or waving through requests,
+            # and back off so the outage is retried (and logged) once per backoff period.
+            redis_limiter.retry_at_ns = now_ns + redis_limiter.retry_after_ns
+            logger.warning(f"Redis rate limit unavailable, limiting in-process: {type(e).__name__}")
+    return RATE_LIMIT.allow(key, now_ns)
+
+
+async def _sweep_rate_limit_buckets() -> None:
+    # Without this, every distinct client that ever posted keeps a bucket for the life of
+    # the process.
+    while True:
+        await asyncio.sleep(RATE_LIMIT_SWEEP_INTERVAL_SECONDS)
+        RATE_LIMIT.prune()
+
+
+# Built once and executed with per-request parameters, so SQLAlchemy reuses the
+# cached compiled form instead of rebuilding the statement construct per call.
+_INSERT_CONSENT = insert(consents_table)
+_INSERT_CHECKIN = insert(checkins_table)
+_SELECT_CONSENT = select(consents_table).where(consents_table.c.user_id == bindparam("user_id"))
+# Scoring needs at least this many check-ins but only reads the newest one, so the
+# history query walks the (user_id, ts) index backwards and stops after this many rows.
+MIN_CHECKINS_FOR_SCORE = 3
+_SELECT_RECENT_HISTORY = (
+    select(checkins_table)
+    .where(checkins_table.c.user_id == bindparam("user_id"))
+    .order_by(checkins_table.c.ts.desc())
+    .limit(MIN_CHECKINS_FOR_SCORE)
+)
+# Both /metrics totals in one round trip, as two scalar subqueries of a single SELECT.
+_COUNT_TOTALS = select(
+    select(func.count()).select_from(checkins_table).scalar_subquery(),
+    select(func.count()).select_from(consents_table).scalar_subquery(),
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -127,20 +385,27 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def anon_key(ip: str, ua: str) -> str:
+# Keyed so a leaked rate-limit key cannot be brute-forced back to an IP without the secret.
+# Derived from SESSION_SECRET rather than generated per process so every worker (and the
+# shared Redis limiter) maps a client to the same key.
+_ANON_KEY = (
+    hashlib.blake2b(settings.session_secret.get_secret_value().encode("utf-8")).digest()
+    if settings.session_secret
+    else b""
+)
+
+
+def anon_key(ip: bytes, ua: bytes) -> bytes:
     """
     Derive an anonymous, deterministic rate-limit key from IP/UA **without** logging them.
-    Inputs are never logged or returned; only a hash is kept in-memory.
+    Inputs are never logged or returned; only a keyed 128-bit BLAKE2b digest is kept in-memory.
+    The raw digest is returned: it is only ever a bucket key, so hex-encoding it would be waste.
     """
-    h = hashlib.sha256()
-    h.update(ip.encode("utf-8"))
-    h.update(b"|")
-    h.update(ua.encode("utf-8"))
-    return h.hexdigest()
+    return hashlib.blake2b(ip + b"|" + ua, digest_size=16, key=_ANON_KEY).digest()
 
 
 class ConsentPayload(BaseModel):
-    user_id: str = Field(min_length=1)
+    user_id: str = Field(min_length=1, max_length=USER_ID_MAX_LENGTH)
     terms_version: str = Field(min_length=1)
     accepted: bool
 
@@ -153,7 +418,7 @@ class ConsentRecord(BaseModel):
 
 
 class CheckIn(BaseModel):
-    user_id: str = Field(min_length=1)
+    user_id: str = Field(min_length=1, max_length=USER_ID_MAX_LENGTH)
     adherence: int = Field(ge=0, le=100)
     mood_trend: int = Field(ge=-10, le=10)
     cravings: int = Field(ge=0, le=100)
@@ -267,8 +532,9 @@ HELP_ERROR_TYPES: Dict[str, str] = {
 }
 HELP_TROUBLESHOOTING_GUIDANCE: Dict[str, str] = {
     "rate_limited": (
-        "If you're hitting rate limits, wait 10 seconds between check-in requests. "
-        "Each client is limited to 5 requests per 10-second window."
+        "If you're hitting rate limits, wait 2 seconds before the next check-in. "
+        "Each client can send a burst of 5 check-ins; after that one more is allowed "
+        "every 2 seconds (5 per 10 seconds sustained)."
     ),
     "insufficient_data": (
         "Risk scoring requires at least 3 check-ins. "
@@ -288,6 +554,20 @@ HELP_TROUBLESHOOTING_GUIDANCE: Dict[str, str] = {
 }
 
 
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson: several times faster than stdlib json on our payloads."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def _model_response(model: BaseModel) -> ORJSONResponse:
+    # Handlers declare response_model=None and document the schema via `responses`, so the
+    # model they just built is dumped once instead of being re-validated and
+    # run through jsonable_encoder by FastAPI.
+    return ORJSONResponse(model.model_dump())
+
+
 def create_error_response(
     error_type: str,
     title: str,
@@ -295,16 +575,16 @@ def create_error_response(
     code: str = "",
     help_url: Optional[str] = None,
     status_code: int = 400,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Create a standardized error response following Problem Details format."""
-    error_detail = ErrorDetail(
+    error_detail = ErrorDetail.model_construct(
         type=f"https://recoveryos.org/errors/{error_type}",
         title=title,
         detail=detail,
         code=code,
         help_url=help_url or f"https://docs.recoveryos.org/api/{error_type}",
     )
-    error_response = ErrorResponse(
+    error_response = ErrorResponse.model_construct(
         error=error_detail,
         meta={
             "timestamp": iso_now(),
@@ -313,48 +593,77 @@ def create_error_response(
     )
     content = error_response.model_dump()
     content["help_url"] = error_detail.help_url
-    return JSONResponse(status_code=status_code, content=content)
+    return ORJSONResponse(status_code=status_code, content=content)
 
 
-def v0_score(checkins: List[CheckIn]) -> Tuple[int, str, str]:
-    latest = checkins[-1]
-    score = 0
-    score += max(0, 100 - latest.adherence) // 4
-    score += max(0, -latest.mood_trend) * 3
-    score += latest.cravings // 3
-    score += int(max(0.0, 8.0 - latest.sleep_hours) * 4)
-    score += latest.isolation // 2
-    score = max(0, min(100, score))
-
-    if score < 30:
-        band = "low"
-    elif score < 55:
-        band = "elevated"
-    elif score < 75:
-        band = "moderate"
-    else:
-        band = "high"
+Band = Literal["low", "elevated", "moderate", "high"]
 
-    reflections = {
-        "low": "You’re staying steady. Consider noting what helped today.",
-        "elevated": "Small shifts matter. A brief walk or call might help.",
-        "moderate": "It’s okay to pause. Try grounding with 3 slow breaths.",
-        "high": "You deserve immediate care. Safety first.",
-    }
-    crisis_msg = (
-        "If you are in danger or thinking about harming yourself, contact local "
-        "emergency services or a trusted support line."
+# Score is clamped to 0..100, so the band for every possible score is precomputed and the
+# threshold ladder becomes a single tuple index.
+BAND_LUT: Tuple[Band, ...] = tuple(
+    "low" if s < 30 else "elevated" if s < 55 else "moderate" if s < 75 else "high"
+    for s in range(101)
+)
+
+_CRISIS_FOOTER = (
+    "If you are in danger or thinking about harming yourself, contact local "
+    "emergency services or a trusted support line."
+)
+_DEFAULT_FOOTER = "This is supportive information only and not a diagnosis."
+BAND_REFLECTIONS: Dict[Band, str] = {
+    "low": "You’re staying steady. Consider noting what helped today.",
+    "elevated": "Small shifts matter. A brief walk or call might help.",
+    "moderate": "It’s okay to pause. Try grounding with 3 slow breaths.",
+    "high": "You deserve immediate care. Safety first.",
+}
+BAND_FOOTERS: Dict[Band, str] = {
+    band: _CRISIS_FOOTER if band == "high" else _DEFAULT_FOOTER for band in BAND_REFLECTIONS
+}
+
+# A scored /check-in body is fixed per band apart from the score, so each band's JSON is
+# rendered once around a score slot (field order follows CheckInResponse) and the handler
+# only formats one integer instead of building and serializing a model.
+_SCORED_BODY_PARTS: Dict[Band, Tuple[bytes, bytes]] = {
+    band: (
+        orjson.dumps({"state": "ok", "band": band})[:-1] + b',"score":',
+        b","
+        + orjson.dumps({"reflection": BAND_REFLECTIONS[band], "footer": BAND_FOOTERS[band]})[1:],
     )
-    footer = (
-        crisis_msg if band == "high" else "This is supportive information only and not a diagnosis."
+    for band in BAND_REFLECTIONS
+}
+# The insufficient-data reply never varies, so its body is serialized exactly once.
+_INSUFFICIENT_DATA_BODY = CheckInResponse(state="insufficient_data").model_dump_json().encode()
+
+
+def v0_score(checkins: List[CheckIn]) -> Tuple[int, Band, str, str]:
+    """Score the latest check-in; returns (score, band, reflection, footer)."""
+    latest = checkins[-1]
+    # Every term is non-negative given the CheckIn field bounds, so only the upper clamp
+    # is needed. Integer floor divisions are kept so scores match previous releases.
+    score = min(
+        100,
+        (100 - latest.adherence) // 4
+        + (3 * -latest.mood_trend if latest.mood_trend < 0 else 0)
+        + latest.cravings // 3
+        + (int((8.0 - latest.sleep_hours) * 4) if latest.sleep_hours < 8.0 else 0)
+        + latest.isolation // 2,
     )
-    return score, reflections[band], footer
+    band = BAND_LUT[score]
+    return score, band, BAND_REFLECTIONS[band], BAND_FOOTERS[band]
 
 
-def get_rate_key(request: Request) -> str:
+def get_rate_key(request: Request) -> bytes:
     # Use IP/UA only to derive an anon hash for rate limiting. Do not log or expose.
-    ip = request.client.host if request.client else "0.0.0.0"
-    ua = request.headers.get("user-agent", "unknown")
+    # Read the raw ASGI scope: the client is a plain tuple and headers are (bytes, bytes)
+    # pairs, so no Headers/Address wrappers are built on this hot path.
+    scope = request.scope
+    client = scope.get("client")
+    ip = client[0].encode() if client else b"0.0.0.0"
+    ua = b"unknown"
+    for name, value in scope["headers"]:
+        if name == b"user-agent":
+            ua = value
+            break
     return anon_key(ip, ua)
 
 
@@ -364,18 +673,9 @@ class TroubleshootConfig(TypedDict):
     additional_resources: List[str]
 
 
-def generate_troubleshoot_steps(
-    issue_type: str, error_message: Optional[str] = None
-) -> TroubleshootResponse:
-    """
-    Generate structured troubleshooting steps for common issues.
-    Privacy-first: no user data is logged, only issue types and structured responses.
-    """
-    # Normalize issue type for matching
-    normalized_issue = issue_type.lower().strip()
-
-    # Define troubleshooting knowledge base
-    troubleshoot_db: Dict[str, TroubleshootConfig] = {
+# Troubleshooting knowledge base; static, so it is built once at import.
+_TROUBLESHOOT_DB: Mapping[str, TroubleshootConfig] = MappingProxyType(
+    {
         "login": {
             "identified_issue": "Authentication or login difficulties",
             "steps": [
@@ -509,60 +809,109 @@ def generate_troubleshoot_steps(
             ],
         },
     }
+)
+_TROUBLESHOOT_KEYS: Tuple[str, ...] = tuple(_TROUBLESHOOT_DB)
+
+# Generic troubleshooting steps for unknown issues
+_TROUBLESHOOT_FALLBACK: TroubleshootConfig = {
+    "identified_issue": "General technical difficulties",
+    "steps": [
+        TroubleshootStep(
+            step_number=1,
+            title="Refresh the page",
+            description="Clear temporary browser state",
+            action="Reload the current page",
+        ),
+        TroubleshootStep(
+            step_number=2,
+            title="Clear browser cache",
+            description="Remove stored data that may be corrupted",
+            action="Clear cache and cookies",
+        ),
+        TroubleshootStep(
+            step_number=3,
+            title="Try different browser",
+            description="Browser compatibility issues",
+            action="Use a different web browser",
+        ),
+        TroubleshootStep(
+            step_number=4,
+            title="Check system requirements",
+            description="Verify browser and system compatibility",
+            action="Ensure using supported browser version",
+        ),
+        TroubleshootStep(
+            step_number=5,
+            title="Contact support",
+            description="Get personalized assistance",
+            action="Provide specific error details to support team",
+        ),
+    ],
+    "additional_resources": [
+        "System requirements documentation available",
+        "Support available during business hours",
+    ],
+}
+
+
+# Returned by /troubleshoot when generating steps fails; only issue_type varies per request.
+_TROUBLESHOOT_ERROR_CONFIG: TroubleshootConfig = {
+    "identified_issue": "Technical difficulties encountered",
+    "steps": [
+        TroubleshootStep(
+            step_number=1,
+            title="Refresh and retry",
+            description="Clear current state and try again",
+            action="Reload the page and resubmit",
+        ),
+        TroubleshootStep(
+            step_number=2,
+            title="Contact support",
+            description="Get assistance with technical issues",
+            action="Provide error details to support team",
+        ),
+    ],
+    "additional_resources": ["Support available during business hours"],
+}
 
-    # Find matching issue type or provide generic response
-    config: TroubleshootConfig
-    if normalized_issue in troubleshoot_db:
-        config = troubleshoot_db[normalized_issue]
-    elif any(key in normalized_issue for key in troubleshoot_db.keys()):
-        # Partial match - find the best match
-        best_match = next(
-            (key for key in troubleshoot_db.keys() if key in normalized_issue), "login"
-        )
-        config = troubleshoot_db[best_match]
-    else:
-        # Generic troubleshooting steps for unknown issues
-        config = {
-            "identified_issue": "General technical difficulties",
-            "steps": [
-                TroubleshootStep(
-                    step_number=1,
-                    title="Refresh the page",
-                    description="Clear temporary browser state",
-                    action="Reload the current page",
-                ),
-                TroubleshootStep(
-                    step_number=2,
-                    title="Clear browser cache",
-                    description="Remove stored data that may be corrupted",
-                    action="Clear cache and cookies",
-                ),
-                TroubleshootStep(
-                    step_number=3,
-                    title="Try different browser",
-                    description="Browser compatibility issues",
-                    action="Use a different web browser",
-                ),
-                TroubleshootStep(
-                    step_number=4,
-                    title="Check system requirements",
-                    description="Verify browser and system compatibility",
-                    action="Ensure using supported browser version",
-                ),
-                TroubleshootStep(
-                    step_number=5,
-                    title="Contact support",
-                    description="Get personalized assistance",
-                    action="Provide specific error details to support team",
-                ),
-            ],
-            "additional_resources": [
-                "System requirements documentation available",
-                "Support available during business hours",
-            ],
-        }
 
-    return TroubleshootResponse(
+@lru_cache(maxsize=256)
+def _match_troubleshoot_config(normalized_issue: str) -> TroubleshootConfig:
+    # Pure function of the normalized issue type, so repeat lookups are served from the cache.
+    if normalized_issue in _TROUBLESHOOT_DB:
+        return _TROUBLESHOOT_DB[normalized_issue]
+    # Partial match - first known key contained in the issue, in a single pass
+    best_match = next((key for key in _TROUBLESHOOT_KEYS if key in normalized_issue), None)
+    return _TROUBLESHOOT_FALLBACK if best_match is None else _TROUBLESHOOT_DB[best_match]
+
+
+@lru_cache(maxsize=256)
+def _troubleshoot_body_tail(normalized_issue: str) -> bytes:
+    # Everything after "issue_type" in the serialized TroubleshootResponse; only the echoed
+    # issue_type differs between requests that resolve to the same config.
+    config = _match_troubleshoot_config(normalized_issue)
+    return (
+        b","
+        + orjson.dumps(
+            {
+                "identified_issue": config["identified_issue"],
+                "steps": [step.model_dump() for step in config["steps"]],
+                "additional_resources": config["additional_resources"],
+            }
+        )[1:]
+    )
+
+
+def generate_troubleshoot_steps(
+    issue_type: str, error_message: Optional[str] = None
+) -> TroubleshootResponse:
+    """
+    Generate structured troubleshooting steps for common issues.
+    Privacy-first: no user data is logged, only issue types and structured responses.
+    """
+    config = _match_troubleshoot_config(issue_type.lower().strip())
+    # issue_type comes from a validated payload and the rest from the static configs.
+    return TroubleshootResponse.model_construct(
         issue_type=issue_type,
         identified_issue=config["identified_issue"],
         steps=config["steps"],
@@ -586,6 +935,14 @@ async def lifespan(app_: FastAPI):
                 "Check DATABASE_URL is correct and database is accessible."
             ) from e
         logger.warning("Continuing startup without database verification (strict_startup=False)")
+    else:
+        try:
+            warmed = prewarm_pool()
+            if warmed:
+                logger.info(f"Database pool prewarmed with {warmed} connections")
+        except Exception as e:
+            # A partial warm-up is harmless; the pool grows lazily as before.
+            logger.warning(f"Database pool prewarm failed: {e}")
 
     if settings.db_auto_migrate:
         alembic_cmd = shutil.which("alembic")
@@ -603,11 +960,25 @@ async def lifespan(app_: FastAPI):
                     raise
     else:
         logger.info("DB_AUTO_MIGRATE is disabled; skipping migrations on startup")
+    sweeper = asyncio.create_task(_sweep_rate_limit_buckets())
     yield
+    sweeper.cancel()
+    await close_http_client()
+    if REDIS_RATE_LIMIT is not None:
+        await REDIS_RATE_LIMIT.close()
 
 
-app = FastAPI(title="Single Compassionate Loop API", version=APP_VERSION, lifespan=lifespan)
+app = FastAPI(
+    title="Single Compassionate Loop API",
+    version=APP_VERSION,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 app.include_router(users_router)
+# /help, /troubleshoot and user listings are large, repetitive JSON; small bodies such as
+# check-in results stay under minimum_size and are sent as-is. Level 5 keeps most of the
+# size win at a fraction of level 9's CPU.
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
 
 if OTEL_AVAILABLE and settings.enable_otel_tracing and settings.otel_exporter_otlp_endpoint:
     try:
@@ -636,15 +1007,14 @@ if OTEL_AVAILABLE and settings.enable_otel_tracing and settings.otel_exporter_ot
         FastAPIInstrumentor.instrument_app(app)
 
         logger.info(
-            "opentelemetry_enabled %s",
-            json.dumps(
-                {
+            "opentelemetry_enabled",
+            extra={
+                "extra_json": {
                     "service": settings.otel_service_name,
                     "endpoint": str(settings.otel_exporter_otlp_endpoint),
                     "sample_rate": settings.traces_sample_rate,
-                },
-                separators=(",", ":"),
-            ),
+                }
+            },
         )
     except Exception as e:
         logger.warning(f"Failed to initialize OpenTelemetry: {e}")
@@ -666,15 +1036,20 @@ async def rate_limit_middleware(
     request: Request,
     call_next: Callable[[Request], Awaitable[StarletteResponse]],
 ) -> StarletteResponse:
-    # Rate limit ONLY POST /check-in
-    if request.method.upper() == "POST" and request.url.path == "/check-in":
+    # Rate limit ONLY POST /check-in. ASGI guarantees an upper-case method, and reading the
+    # scope avoids building a URL object for every other request (probes, metrics).
+    scope = request.scope
+    if scope["path"] == "/check-in" and scope["method"] == "POST":
         key = get_rate_key(request)
-        if not RATE_LIMIT.allow(key):
+        if not await check_rate_limit(key, time.monotonic_ns()):
             logger.info("rate_limited")
             return create_error_response(
                 error_type="rate-limit",
                 title="Rate Limit Exceeded",
-                detail="Maximum 5 check-ins per 10 seconds allowed",
+                detail=(
+                    "Up to 5 check-ins in a burst, then 1 more every 2 seconds "
+                    "(5 per 10 seconds sustained)"
+                ),
                 code="E_RATE_LIMITED",
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             )
@@ -682,81 +1057,110 @@ async def rate_limit_middleware(
     return response
 
 
+# Liveness probes hit this constantly; serve one prebuilt response (body and headers
+# rendered once) for both GET and HEAD.
+_HEALTHZ_RESPONSE = PlainTextResponse("ok", headers={"Cache-Control": "no-store"})
+
+
 @app.get("/healthz")
+@app.head("/healthz", include_in_schema=False)
 async def healthz() -> PlainTextResponse:
-    return PlainTextResponse("ok")
+    return _HEALTHZ_RESPONSE
 
 
 @app.get("/readyz")
-async def readyz() -> JSONResponse:
-    return JSONResponse({"ok": True, "uptime_s": int(time.time() - APP_START_TS)})
+async def readyz() -> Response:
+    # Only the uptime varies, so the JSON body is formatted straight into bytes rather than
+    # going through a dict and the JSON encoder on every probe.
+    body = b'{"ok":true,"uptime_s":%d}' % int(time.monotonic() - APP_START_TS)
+    return Response(body, media_type="application/json")
+
+
+# Prometheus exposition text; the HELP/TYPE lines never change, so only the three values
+# are formatted per scrape.
+_METRICS_TEMPLATE = (
+    b"# HELP app_uptime_seconds Application uptime in seconds\n"
+    b"# TYPE app_uptime_seconds gauge\n"
+    b"app_uptime_seconds %d\n"
+    b"# HELP app_checkins_total Total check-ins received\n"
+    b"# TYPE app_checkins_total counter\n"
+    b"app_checkins_total %d\n"
+    b"# HELP app_consents_total Total consents recorded\n"
+    b"# TYPE app_consents_total counter\n"
+    b"app_consents_total %d"
+)
 
 
 @app.get("/metrics")
 async def metrics(db: Session = Depends(get_db)) -> PlainTextResponse:
-    checkins_stmt = select(func.count()).select_from(checkins_table)
-    checkins_count = db.execute(checkins_stmt).scalar()
-
-    consents_stmt = select(func.count()).select_from(consents_table)
-    consents_count = db.execute(consents_stmt).scalar()
-
-    lines = [
-        "# HELP app_uptime_seconds Application uptime in seconds",
-        "# TYPE app_uptime_seconds gauge",
-        f"app_uptime_seconds {int(time.time() - APP_START_TS)}",
-        "# HELP app_checkins_total Total check-ins received",
-        "# TYPE app_checkins_total counter",
-        f"app_checkins_total {checkins_count}",
-        "# HELP app_consents_total Total consents recorded",
-        "# TYPE app_consents_total counter",
-        f"app_consents_total {consents_count}",
-    ]
-    return PlainTextResponse("\n".join(lines))
+    checkins_count, consents_count = db.execute(_COUNT_TOTALS).one()
+    uptime = int(time.monotonic() - APP_START_TS)
+    return PlainTextResponse(_METRICS_TEMPLATE % (uptime, checkins_count, consents_count))
 
 
-@app.get("/help", response_model=HelpResponse)
-async def help_endpoint() -> HelpResponse:
-    return HelpResponse(
+# Everything in /help and /version is fixed at startup, so both bodies are rendered once
+# and served as bytes.
+_HELP_BODY = orjson.dumps(
+    HelpResponse(
         api_version=APP_VERSION,
         documentation_url="https://docs.recoveryos.org/api",
         support_contact="support@recoveryos.org",
         endpoints=HELP_ENDPOINTS_CATALOG,
         error_types=HELP_ERROR_TYPES,
         troubleshooting=HELP_TROUBLESHOOTING_GUIDANCE,
+    ).model_dump()
+)
+_VERSION_BODY = orjson.dumps({"app_version": APP_VERSION})
+
+
+@app.get("/help", response_model=None, responses={200: {"model": HelpResponse}})
+async def help_endpoint() -> Response:
+    return Response(_HELP_BODY, media_type="application/json")
+
+
+@app.get("/version", response_model=None, responses={200: {"model": Dict[str, str]}})
+async def version() -> Response:
+    return Response(_VERSION_BODY, media_type="application/json")
+
+
+def _record_consent(db: Session, rec: ConsentRecord) -> None:
+    db.execute(
+        _INSERT_CONSENT,
+        {
+            "user_id": rec.user_id,
+            "terms_version": rec.terms_version,
+            "accepted": rec.accepted,
+            "recorded_at": rec.recorded_at,
+        },
     )
+    db.commit()
 
 
-@app.get("/version")
-def version() -> dict:
-    return {"app_version": APP_VERSION}
+def _load_consent(db: Session, user_id: str) -> Optional[Row[Any]]:
+    return db.execute(_SELECT_CONSENT, {"user_id": user_id}).fetchone()
 
 
-@app.post("/consents", response_model=ConsentRecord)
-async def post_consents(payload: ConsentPayload, db: Session = Depends(get_db)) -> ConsentRecord:
-    rec = ConsentRecord(
+@app.post("/consents", response_model=None, responses={200: {"model": ConsentRecord}})
+async def post_consents(payload: ConsentPayload, db: Session = Depends(get_db)) -> ORJSONResponse:
+    # Every field is either a validated payload value or server-generated, so the record is
+    # assembled without running validators again; the same holds for rows read back below.
+    rec = ConsentRecord.model_construct(
         user_id=payload.user_id,
         terms_version=payload.terms_version,
         accepted=payload.accepted,
         recorded_at=iso_now(),
     )
 
-    stmt = insert(consents_table).values(
-        user_id=rec.user_id,
-        terms_version=rec.terms_version,
-        accepted=rec.accepted,
-        recorded_at=rec.recorded_at,
-    )
-    db.execute(stmt)
-    db.commit()
+    # Blocking engine calls go to the threadpool, as in /check-in, so the loop stays free.
+    await run_in_threadpool(_record_consent, db, rec)
 
     logger.info("consent_recorded")
-    return rec
+    return _model_response(rec)
 
 
-@app.get("/consents/{user_id}", response_model=ConsentRecord)
-async def get_consents(user_id: str, db: Session = Depends(get_db)):
-    stmt = select(consents_table).where(consents_table.c.user_id == user_id)
-    result = db.execute(stmt).fetchone()
+@app.get("/consents/{user_id}", response_model=None, responses={200: {"model": ConsentRecord}})
+async def get_consents(user_id: str, db: Session = Depends(get_db)) -> ORJSONResponse:
+    result = await run_in_threadpool(_load_consent, db, user_id)
 
     if not result:
         return create_error_response(
@@ -767,39 +1171,46 @@ async def get_consents(user_id: str, db: Session = Depends(get_db)):
             status_code=404,
         )
 
-    return ConsentRecord(
-        user_id=result.user_id,
-        terms_version=result.terms_version,
-        accepted=result.accepted,
-        recorded_at=result.recorded_at,
+    return _model_response(
+        ConsentRecord.model_construct(
+            user_id=result.user_id,
+            terms_version=result.terms_version,
+            accepted=result.accepted,
+            recorded_at=result.recorded_at,
+        )
     )
 
 
-@app.post("/check-in", response_model=CheckInResponse)
-async def check_in(
-    payload: CheckIn, response: Response, db: Session = Depends(get_db)
-) -> CheckInResponse:
-    stmt = insert(checkins_table).values(
-        user_id=payload.user_id,
-        adherence=payload.adherence,
-        mood_trend=payload.mood_trend,
-        cravings=payload.cravings,
-        sleep_hours=payload.sleep_hours,
-        isolation=payload.isolation,
-        ts=payload.ts,
+def _record_checkin(db: Session, payload: CheckIn) -> Sequence[Row[Any]]:
+    """Insert the check-in and return the user's newest check-ins, committed as one transaction."""
+    db.execute(
+        _INSERT_CHECKIN,
+        {
+            "user_id": payload.user_id,
+            "adherence": payload.adherence,
+            "mood_trend": payload.mood_trend,
+            "cravings": payload.cravings,
+            "sleep_hours": payload.sleep_hours,
+            "isolation": payload.isolation,
+            "ts": payload.ts,
+        },
     )
-    db.execute(stmt)
+
+    history_rows = db.execute(_SELECT_RECENT_HISTORY, {"user_id": payload.user_id}).fetchall()
+    # Insert and history read share one transaction (the read sees the new row); one commit.
     db.commit()
+    return history_rows
 
-    history_stmt = (
-        select(checkins_table)
-        .where(checkins_table.c.user_id == payload.user_id)
-        .order_by(checkins_table.c.ts)
-    )
-    history_rows = db.execute(history_stmt).fetchall()
 
+@app.post("/check-in", response_model=None, responses={200: {"model": CheckInResponse}})
+async def check_in(payload: CheckIn, response: Response, db: Session = Depends(get_db)) -> Response:
+    # The engine is synchronous; run the blocking round trips on the threadpool so other
+    # requests keep being served on the event loop meanwhile.
+    history_rows = await run_in_threadpool(_record_checkin, db, payload)
+
+    # Rows were validated as CheckIn payloads on the way in; skip re-validating them.
     history = [
-        CheckIn(
+        CheckIn.model_construct(
             user_id=row.user_id,
             adherence=row.adherence,
             mood_trend=row.mood_trend,
@@ -808,96 +1219,81 @@ async def check_in(
             isolation=row.isolation,
             ts=row.ts,
         )
-        for row in history_rows
+        # Rows arrive newest first; scoring expects chronological order.
+        for row in reversed(history_rows)
     ]
 
-    if len(history) < 3:
+    if len(history) < MIN_CHECKINS_FOR_SCORE:
         logger.info("insufficient_data")
-        return CheckInResponse(state="insufficient_data")
-
-    score, reflection, footer = v0_score(history)
-    band: Literal["low", "elevated", "moderate", "high"]
-    if score < 30:
-        band = "low"
-    elif score < 55:
-        band = "elevated"
-    elif score < 75:
-        band = "moderate"
-    else:
-        band = "high"
+        return Response(_INSUFFICIENT_DATA_BODY, media_type="application/json")
 
-    logger.info(
-        "check_in_scored %s",
-        json.dumps({"user": "redacted", "band": band, "score": score}, separators=(",", ":")),
-    )
-    return CheckInResponse(
-        state="ok",
-        band=band,
-        score=score,
-        reflection=reflection,
-        footer=footer,
-    )
+    # The reflection and footer are already baked into the per-band body parts.
+    score, band = v0_score(history)[:2]
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "check_in_scored",
+            extra={"extra_json": {"user": "redacted", "band": band, "score": score}},
+        )
+    prefix, suffix = _SCORED_BODY_PARTS[band]
+    return Response(prefix + b"%d" % score + suffix, media_type="application/json")
 
 
-@app.post("/troubleshoot", response_model=TroubleshootResponse)
-async def troubleshoot(payload: TroubleshootPayload) -> TroubleshootResponse:
+@app.post("/troubleshoot", response_model=None, responses={200: {"model": TroubleshootResponse}})
+async def troubleshoot(payload: TroubleshootPayload) -> Response:
     """
     Provide structured troubleshooting steps for common issues.
     Privacy-first: logs only issue type categories, never user data.
     """
     try:
-        # Generate troubleshooting response
-        response = generate_troubleshoot_steps(payload.issue_type, payload.error_message)
+        # Same body as generate_troubleshoot_steps() would serialize to, minus the model
+        # construction: the cached tail is appended to the echoed issue_type.
+        normalized_issue = payload.issue_type.lower().strip()
+        body = (
+            b'{"issue_type":'
+            + orjson.dumps(payload.issue_type)
+            + _troubleshoot_body_tail(normalized_issue)
+        )
 
         # Privacy-safe logging: log only sanitized issue type and step count
-        issue_category = payload.issue_type.lower().strip()[:20]  # Truncate for logging
-        logger.info(
-            "troubleshoot_requested %s",
-            json.dumps(
-                {
-                    "issue_category": issue_category,
-                    "steps_provided": len(response.steps),
-                    "has_error_msg": payload.error_message is not None,
-                    "has_context": payload.user_context is not None,
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "troubleshoot_requested",
+                extra={
+                    "extra_json": {
+                        # Truncate for logging
+                        "issue_category": normalized_issue[:20],
+                        "steps_provided": len(
+                            _match_troubleshoot_config(normalized_issue)["steps"]
+                        ),
+                        "has_error_msg": payload.error_message is not None,
+                        "has_context": payload.user_context is not None,
+                    }
                 },
-                separators=(",", ":"),
-            ),
-        )
+            )
 
-        return response
+        return Response(body, media_type="application/json")
 
     except Exception as e:
         # Enhanced logging for debugging unexpected behaviors (no user content logged)
         logger.error(
-            "troubleshoot_error %s",
-            json.dumps(
-                {
+            "troubleshoot_error",
+            extra={
+                "extra_json": {
                     "issue_category": payload.issue_type.lower().strip()[:20],
                     "error_type": type(e).__name__,
                     "has_error_msg": payload.error_message is not None,
                     "error_msg_length": len(payload.error_message) if payload.error_message else 0,
-                },
-                separators=(",", ":"),
-            ),
+                }
+            },
         )
 
         # Return generic fallback response
-        return TroubleshootResponse(
-            issue_type=payload.issue_type,
-            identified_issue="Technical difficulties encountered",
-            steps=[
-                TroubleshootStep(
-                    step_number=1,
-                    title="Refresh and retry",
-                    description="Clear current state and try again",
-                    action="Reload the page and resubmit",
-                ),
-                TroubleshootStep(
-                    step_number=2,
-                    title="Contact support",
-                    description="Get assistance with technical issues",
-                    action="Provide error details to support team",
-                ),
-            ],
-            additional_resources=["Support available during business hours"],
+        return _model_response(
+            TroubleshootResponse.model_construct(
+                issue_type=payload.issue_type,
+                identified_issue=_TROUBLESHOOT_ERROR_CONFIG["identified_issue"],
+                steps=_TROUBLESHOOT_ERROR_CONFIG["steps"],
+                additional_resources=_TROUBLESHOOT_ERROR_CONFIG["additional_resources"],
+            )
         )
@@ -23,16 +23,45 @@ class Settings(BaseSettings):
     database_ro_url: Optional[SecretStr] = Field(default=None, description="Read-only replica URL")
     db_pool_size: int = Field(default=10, description="Database connection pool size")
     db_max_overflow: int = Field(default=20, description="Database pool overflow")
+    db_pool_timeout: int = Field(
+        default=30, description="Seconds to wait for a pooled database connection"
+    )
+    db_pool_recycle: int = Field(
+        default=1800, description="Recycle pooled database connections after this many seconds"
+    )
+    db_pool_pre_ping: bool = Field(
+        default=True, description="Check pooled database connections before use"
+    )
+    db_pool_use_lifo: bool = Field(
+        default=True, description="Reuse the most recently returned database connection first"
+    )
 
     jwt_public_keys_url: Optional[HttpUrl] = Field(default=None, description="JWKS endpoint URL")
     jwt_algorithm: str = Field(default="RS256", description="JWT signature algorithm")
     jwt_keys_cache_ttl: int = Field(
         default=3600, description="JWT public keys cache TTL in seconds"
     )
+    jwt_keys_max_stale: int = Field(
+        default=14400,
+        description="Maximum age in seconds of cached JWT public keys while refresh is failing",
+    )
+    jwt_keys_refresh_backoff: int = Field(
+        default=30, description="Seconds to wait after a failed JWKS fetch before retrying"
+    )
     session_secret: Optional[SecretStr] = Field(default=None, description="Session encryption key")
 
     rate_limit_capacity: int = Field(default=5, description="Rate limit bucket capacity")
     rate_limit_window_seconds: int = Field(default=10, description="Rate limit time window")
+    rate_limit_redis_url: Optional[SecretStr] = Field(
+        default=None,
+        description="Redis URL for a rate limit shared across workers; in-process when unset",
+    )
+    rate_limit_redis_timeout_seconds: float = Field(
+        default=0.1, description="Redis connect and socket timeout for rate limit checks"
+    )
+    rate_limit_redis_retry_seconds: float = Field(
+        default=5.0, description="Seconds to limit in-process after a Redis rate limit failure"
+    )
 
     enable_otel_tracing: bool = Field(default=False, description="Enable OpenTelemetry tracing")
     otel_exporter_otlp_endpoint: Optional[HttpUrl] = Field(default=None)
@@ -4,7 +4,7 @@ from typing import Dict, Generator, List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, EmailStr, Field
-from sqlalchemy import Column, Integer, String, Table, insert, select
+from sqlalchemy import Column, Integer, String, Table, bindparam, insert, select
 from sqlalchemy.orm import Session
 
 from app.auth import get_current_user
@@ -22,6 +22,11 @@ users_table = Table(
     Column("is_active", Integer, default=1, nullable=False),
 )
 
+_INSERT_USER = insert(users_table)
+_SELECT_USER_BY_EMAIL = select(users_table).where(users_table.c.email == bindparam("email"))
+_SELECT_USER_BY_ID = select(users_table).where(users_table.c.id == bindparam("user_id"))
+_SELECT_USERS = select(users_table).order_by(users_table.c.created_at.desc())
+
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -45,29 +50,31 @@ def get_db() -> Generator[Session, None, None]:
 
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user(
+def create_user(
     user: UserCreate, db: Session = Depends(get_db), current_user: Dict = Depends(get_current_user)
 ) -> UserResponse:
     from datetime import datetime, timezone
 
-    stmt = select(users_table).where(users_table.c.email == user.email)
-    with engine.connect() as conn:
-        existing = conn.execute(stmt).fetchone()
-
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="User with this email already exists"
-        )
-
     created_at = datetime.now(timezone.utc).isoformat()
 
-    insert_stmt = insert(users_table).values(
-        email=user.email, full_name=user.full_name, created_at=created_at, is_active=1
-    )
-
-    with engine.connect() as conn:
-        result = conn.execute(insert_stmt)
-        conn.commit()
+    # One checkout and one transaction for the duplicate check and the insert;
+    # engine.begin() commits on exit.
+    with engine.begin() as conn:
+        existing = conn.execute(_SELECT_USER_BY_EMAIL, {"email": user.email}).fetchone()
+        if existing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email already exists",
+            )
+        result = conn.execute(
+            _INSERT_USER,
+            {
+                "email": user.email,
+                "full_name": user.full_name,
+                "created_at": created_at,
+                "is_active": 1,
+            },
+        )
         user_id = result.inserted_primary_key[0]
 
     return UserResponse(
@@ -85,13 +92,11 @@ async def get_current_user_info(current_user: Dict = Depends(get_current_user))
 
 
 @router.get("/", response_model=List[UserResponse])
-async def list_users(
+def list_users(
     db: Session = Depends(get_db), current_user: Dict = Depends(get_current_user)
 ) -> List[UserResponse]:
-    stmt = select(users_table).order_by(users_table.c.created_at.desc())
-
     with engine.connect() as conn:
-        rows = conn.execute(stmt).fetchall()
+        rows = conn.execute(_SELECT_USERS).fetchall()
 
     return [
         UserResponse(
@@ -106,13 +111,11 @@ async def list_users(
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: int, db: Session = Depends(get_db), current_user: Dict = Depends(get_current_user)
 ) -> UserResponse:
-    stmt = select(users_table).where(users_table.c.id == user_id)
-
     with engine.connect() as conn:
-        row = conn.execute(stmt).fetchone()
+        row = conn.execute(_SELECT_USER_BY_ID, {"user_id": user_id}).fetchone()
 
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
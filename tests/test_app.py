@@ -80,7 +80,13 @@ def test_insufficient_data_before_three_checkins(client):
     assert r1.json()["state"] == "insufficient_data"
     r2 = client.post("/check-in", json=p)
     assert r2.status_code == 200
-    assert r2.json()["state"] == "insufficient_data"
+    assert r2.json() == {
+        "state": "insufficient_data",
+        "band": None,
+        "score": None,
+        "reflection": None,
+        "footer": None,
+    }
 
 
 def test_high_risk_payload_yields_high_band_and_crisis_footer(client):
@@ -132,6 +138,108 @@ def test_rate_limit_returns_429_after_rapid_calls(client):
     assert hit_429, "Expected 429 after rapid calls"
 
 
+def test_rate_limiter_token_bucket_bursts_then_refills():
+    from app.main import InMemoryRateLimiter, RateLimitConfig
+
+    sec = 1_000_000_000
+    limiter = InMemoryRateLimiter(RateLimitConfig(window_seconds=10, capacity=5))
+    assert all(limiter.allow(b"k", now_ns=100 * sec) for _ in range(5))
+    assert not limiter.allow(b"k", now_ns=100 * sec)
+    # Refill is capacity / window = 0.5 tokens per second.
+    assert not limiter.allow(b"k", now_ns=101 * sec)
+    assert limiter.allow(b"k", now_ns=102 * sec)
+    assert limiter.allow(b"other", now_ns=102 * sec)
+
+
+def test_rate_limiter_refill_keeps_sub_millitoken_remainder():
+    from app.main import InMemoryRateLimiter, RateLimitConfig
+
+    sec = 1_000_000_000
+    limiter = InMemoryRateLimiter(RateLimitConfig(window_seconds=10, capacity=5))
+    for _ in range(5):
+        limiter.allow(b"k", now_ns=0)
+    # Polling every 1.5 ms (0.75 millitokens) must still refill a whole token after 2 s.
+    now = 0
+    while now < 2 * sec - 1_500_000:
+        now += 1_500_000
+        assert not limiter.allow(b"k", now_ns=now)
+    assert limiter.allow(b"k", now_ns=2 * sec)
+
+
+def test_rate_limiter_prune_drops_only_fully_refilled_buckets():
+    from app.main import InMemoryRateLimiter, RateLimitConfig
+
+    sec = 1_000_000_000
+    limiter = InMemoryRateLimiter(RateLimitConfig(window_seconds=10, capacity=5))
+    limiter.allow(b"idle", now_ns=0)
+    limiter.allow(b"active", now_ns=5 * sec)
+    assert limiter.prune(now_ns=10 * sec) == 1
+    assert set(limiter.buckets) == {b"active"}
+
+
+def test_rate_limiter_evicts_least_recently_used_key_at_cap():
+    from app.main import InMemoryRateLimiter, RateLimitConfig
+
+    limiter = InMemoryRateLimiter(RateLimitConfig(capacity=1, max_keys=2))
+    assert limiter.allow(b"busy", now_ns=0)
+    assert limiter.allow(b"a", now_ns=0)
+    assert not limiter.allow(b"busy", now_ns=1)  # touch: "a" is now least recently used
+    assert limiter.allow(b"b", now_ns=2)
+    assert list(limiter.buckets) == [b"busy", b"b"]
+    assert not limiter.allow(b"busy", now_ns=3)
+
+
+def test_band_lut_thresholds():
+    from app.main import BAND_LUT
+
+    assert len(BAND_LUT) == 101
+    assert (BAND_LUT[0], BAND_LUT[29], BAND_LUT[30]) == ("low", "low", "elevated")
+    assert (BAND_LUT[54], BAND_LUT[55]) == ("elevated", "moderate")
+    assert (BAND_LUT[74], BAND_LUT[75], BAND_LUT[100]) == ("moderate", "high", "high")
+
+
+def test_json_formatter_timestamp_matches_isoformat():
+    import json
+    import logging
+    from datetime import datetime, timezone
+
+    from app.main import JsonFormatter
+
+    formatter = JsonFormatter()
+    for created in (1700000000.123456, 1700000000.9, 1700000001.000001):
+        record = logging.LogRecord("app", logging.INFO, __file__, 1, "m %s", ("x",), None)
+        record.created = created
+        out = json.loads(formatter.format(record))
+        parsed = datetime.fromisoformat(out["ts"])
+        expected = datetime.fromtimestamp(created, tz=timezone.utc)
+        assert abs((parsed - expected).total_seconds()) < 2e-6
+        assert out["msg"] == "m x" and out["level"] == "INFO"
+
+
+def test_json_formatter_merges_extra_json_without_overriding_base_fields():
+    import json
+    import logging
+
+    from app.main import JsonFormatter
+
+    record = logging.LogRecord("app", logging.INFO, __file__, 1, "check_in_scored", None, None)
+    record.extra_json = {"band": "low", "score": 12, "level": "spoofed"}
+    out = json.loads(JsonFormatter().format(record))
+    assert out["msg"] == "check_in_scored" and out["level"] == "INFO"
+    assert (out["band"], out["score"]) == ("low", 12)
+
+
+def test_user_id_longer_than_column_is_rejected(client):
+    r = client.post(
+        "/consents", json={"user_id": "u" * 65, "terms_version": "v1", "accepted": True}
+    )
+    assert r.status_code == 422
+    r = client.post(
+        "/consents", json={"user_id": "u" * 64, "terms_version": "v1", "accepted": True}
+    )
+    assert r.status_code == 200
+
+
 def test_consents_roundtrip(client):
     r = client.post(
         "/consents",
@@ -159,6 +267,17 @@ def test_metrics_endpoint_format_and_prometheus_compliance(client):
     assert "app_checkins_total " in text
 
 
+def test_metrics_totals_match_table_counts(client):
+    from sqlalchemy import text
+
+    with test_engine.connect() as conn:
+        checkins = conn.execute(text("SELECT COUNT(*) FROM checkins")).scalar()
+        consents = conn.execute(text("SELECT COUNT(*) FROM consents")).scalar()
+    lines = client.get("/metrics").text.splitlines()
+    assert f"app_checkins_total {checkins}" in lines
+    assert f"app_consents_total {consents}" in lines
+
+
 # ---- Troubleshoot tests (keep) ----
 def test_troubleshoot_valid_issue_types(client):
     valid_issues = ["login", "check-in", "consent", "network"]
@@ -336,3 +455,712 @@ def test_help_endpoint_status_codes_accuracy(client):
     assert "200" in endpoints["GET /healthz"]["status_codes"]
     assert "200" in endpoints["GET /readyz"]["status_codes"]
     assert "200" in endpoints["GET /metrics"]["status_codes"]
+
+
+def test_lazy_engine_passes_pool_settings_for_non_sqlite(monkeypatch):
+    import app.database
+    from app.settings import settings
+
+    captured = {}
+
+    def fake_create_engine(url, **kwargs):
+        captured["url"] = url
+        captured.update(kwargs)
+        return test_engine
+
+    monkeypatch.setenv("DATABASE_URL", "postgresql://user:pass@db:5432/recoveryos")
+    monkeypatch.setattr(app.database, "create_engine", fake_create_engine)
+    monkeypatch.setattr(app.database, "SessionLocal", sessionmaker())
+
+    app.database._LazyEngine()._ensure_initialized()
+
+    assert captured["url"] == "postgresql://user:pass@db:5432/recoveryos"
+    assert captured["pool_size"] == settings.db_pool_size
+    assert captured["max_overflow"] == settings.db_max_overflow
+    assert captured["pool_timeout"] == settings.db_pool_timeout
+    assert captured["pool_recycle"] == settings.db_pool_recycle
+    assert captured["pool_pre_ping"] is settings.db_pool_pre_ping
+    assert captured["pool_use_lifo"] is settings.db_pool_use_lifo
+
+
+def test_lazy_engine_applies_sqlite_pragmas(monkeypatch, tmp_path):
+    import app.database
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'pragmas.db'}")
+    monkeypatch.setattr(app.database, "SessionLocal", sessionmaker())
+
+    file_engine = app.database._LazyEngine()._ensure_initialized()
+    try:
+        with file_engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA temp_store").scalar() == 2
+    finally:
+        file_engine.dispose()
+
+
+def test_prewarm_pool_holds_pool_size_connections_at_once(monkeypatch):
+    import threading
+    from types import SimpleNamespace
+
+    import app.database
+    from app.settings import settings
+
+    state = {"open": 0, "peak": 0, "pings": 0}
+    lock = threading.Lock()
+
+    class FakeConnection:
+        def exec_driver_sql(self, sql):
+            assert sql == "SELECT 1"
+            with lock:
+                state["pings"] += 1
+
+        def close(self):
+            with lock:
+                state["open"] -= 1
+
+    def connect():
+        with lock:
+            state["open"] += 1
+            state["peak"] = max(state["peak"], state["open"])
+        return FakeConnection()
+
+    fake_engine = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), connect=connect)
+    monkeypatch.setattr(app.database, "engine", fake_engine)
+    monkeypatch.setattr(settings, "db_pool_size", 4)
+
+    assert app.database.prewarm_pool() == 4
+    assert state == {"open": 0, "peak": 4, "pings": 4}
+
+    fake_engine.dialect.name = "sqlite"
+    assert app.database.prewarm_pool() == 0
+
+
+def test_checkins_indexes_created_and_history_query_uses_them(client):
+    from sqlalchemy import inspect
+
+    index_columns = {
+        ix["name"]: ix["column_names"] for ix in inspect(test_engine).get_indexes("checkins")
+    }
+    assert index_columns["ix_checkins_user_ts"] == ["user_id", "ts"]
+    assert index_columns["ix_checkins_ts"] == ["ts"]
+    assert "ix_checkins_user_id" not in index_columns
+
+    p = {
+        "user_id": "u_idx",
+        "adherence": 90,
+        "mood_trend": 0,
+        "cravings": 10,
+        "sleep_hours": 8.0,
+        "isolation": 10,
+    }
+    # Own user-agent so the shared rate limiter's budget from earlier tests doesn't apply.
+    headers = {"user-agent": "index-layout-test"}
+    states = [client.post("/check-in", json=p, headers=headers).json()["state"] for _ in range(3)]
+    assert states == ["insufficient_data", "insufficient_data", "ok"]
+
+
+# ---- JWKS cache tests ----
+JWKS_URL = "https://idp.example.org/.well-known/jwks.json"
+HS_SECRET = b"jwks-test-secret-0123456789abcdef"
+
+
+def _oct_jwk(kid: str) -> dict:
+    import base64
+
+    return {
+        "kty": "oct",
+        "kid": kid,
+        "alg": "HS256",
+        "k": base64.urlsafe_b64encode(HS_SECRET).rstrip(b"=").decode(),
+    }
+
+
+@pytest.fixture
+def jwks(monkeypatch):
+    """Point the JWT validator at a mocked JWKS endpoint and record requests."""
+    import httpx
+
+    import app.auth
+    from app.settings import settings
+
+    state = {"requests": [], "responses": []}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state["requests"].append(request)
+        return state["responses"].pop(0)
+
+    monkeypatch.setattr(
+        app.auth, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(settings, "jwt_public_keys_url", JWKS_URL)
+    monkeypatch.setattr(settings, "jwt_algorithm", "HS256")
+    state["validator"] = app.auth.JWTValidator()
+    return state
+
+
+def test_jwks_stale_keys_served_while_etag_revalidation_runs(jwks):
+    import asyncio
+
+    import httpx
+
+    from app.settings import settings
+
+    validator = jwks["validator"]
+    jwks["responses"] = [
+        httpx.Response(200, json={"keys": [_oct_jwk("k1")]}, headers={"ETag": '"v1"'}),
+        httpx.Response(304),
+    ]
+
+    async def scenario():
+        keys = await validator.get_public_keys()
+        assert list(keys) == ["k1"]
+
+        validator._keys_cached_at -= settings.jwt_keys_cache_ttl + 1
+        stale = await validator.get_public_keys()
+        assert stale is keys  # returned without waiting for the network
+        assert len(jwks["requests"]) == 1
+
+        await validator._refresh_task
+        assert jwks["requests"][1].headers["If-None-Match"] == '"v1"'
+        assert validator._keys_fresh()
+        assert await validator.get_public_keys() is keys
+
+    asyncio.run(scenario())
+
+
+def test_jwks_cold_fetch_is_single_flight(jwks):
+    import asyncio
+
+    import httpx
+
+    validator = jwks["validator"]
+    jwks["responses"] = [httpx.Response(200, json={"keys": [_oct_jwk("k1")]})]
+
+    async def scenario():
+        return await asyncio.gather(*(validator.get_public_keys() for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert all(list(keys) == ["k1"] for keys in results)
+    assert len(jwks["requests"]) == 1
+
+
+def test_jwks_keys_past_max_stale_are_not_trusted(jwks):
+    import asyncio
+
+    import httpx
+
+    from app.settings import settings
+
+    validator = jwks["validator"]
+    jwks["responses"] = [
+        httpx.Response(200, json={"keys": [_oct_jwk("k1")]}),
+        httpx.Response(500),
+    ]
+
+    async def scenario():
+        await validator.get_public_keys()
+        validator._keys_cached_at -= settings.jwt_keys_max_stale + 1
+        return await validator.get_public_keys()
+
+    assert asyncio.run(scenario()) == {}
+    assert len(jwks["requests"]) == 2
+
+
+def test_jwks_failed_refresh_backs_off_before_retrying(jwks):
+    import asyncio
+
+    import httpx
+
+    from app.settings import settings
+
+    validator = jwks["validator"]
+    jwks["responses"] = [
+        httpx.Response(200, json={"keys": [_oct_jwk("k1")]}),
+        httpx.Response(503),
+        httpx.Response(200, json={"keys": [_oct_jwk("k1")]}),
+    ]
+
+    async def scenario():
+        keys = await validator.get_public_keys()
+        validator._keys_cached_at -= settings.jwt_keys_cache_ttl + 1
+        assert await validator.get_public_keys() is keys
+        await validator._refresh_task
+        assert len(jwks["requests"]) == 2
+
+        # Still stale, but within the backoff: stale keys are served with no new fetch.
+        for _ in range(5):
+            assert await validator.get_public_keys() is keys
+        assert validator._refresh_task.done()
+        assert len(jwks["requests"]) == 2
+
+        validator._refresh_failed_at -= settings.jwt_keys_refresh_backoff + 1
+        await validator.get_public_keys()
+        await validator._refresh_task
+        assert len(jwks["requests"]) == 3
+        assert validator._keys_fresh()
+
+    asyncio.run(scenario())
+
+
+def test_jwks_unknown_kid_with_stale_keys_refreshes_once(jwks):
+    import asyncio
+
+    import httpx
+    from jose import jwt
+
+    from app.settings import settings
+
+    validator = jwks["validator"]
+    jwks["responses"] = [
+        httpx.Response(200, json={"keys": [_oct_jwk("k1")]}),
+        httpx.Response(200, json={"keys": [_oct_jwk("k1"), _oct_jwk("k2")]}),
+    ]
+    token = jwt.encode({"sub": "rotated"}, HS_SECRET, algorithm="HS256", headers={"kid": "k2"})
+
+    async def scenario():
+        await validator.get_public_keys()
+        validator._keys_cached_at -= settings.jwt_keys_cache_ttl + 1
+        return await validator.validate_token(token)
+
+    assert asyncio.run(scenario())["sub"] == "rotated"
+    assert len(jwks["requests"]) == 2
+
+
+def test_jwks_http_client_is_shared_until_closed():
+    import asyncio
+
+    from app.auth import close_http_client, get_http_client
+
+    client = get_http_client()
+    assert get_http_client() is client
+    asyncio.run(close_http_client())
+    assert client.is_closed
+    assert get_http_client() is not client
+
+
+def test_create_user_then_duplicate_email_is_rejected(client):
+    payload = {"email": "member@example.org", "full_name": "Member One"}
+    r = client.post("/users/", json=payload)
+    assert r.status_code == 201
+    assert r.json()["email"] == "member@example.org"
+
+    dup = client.post("/users/", json=payload)
+    assert dup.status_code == 400
+    assert [u["email"] for u in client.get("/users/").json()] == ["member@example.org"]
+
+
+def test_jwt_key_object_constructed_once_per_kid(jwks):
+    import asyncio
+
+    import httpx
+    from jose import jwt
+
+    validator = jwks["validator"]
+    jwks["responses"] = [httpx.Response(200, json={"keys": [_oct_jwk("k1")]})]
+    token = jwt.encode({"sub": "member"}, HS_SECRET, algorithm="HS256", headers={"kid": "k1"})
+
+    async def scenario():
+        first = await validator.validate_token(token)
+        key_object = validator._key_objects["k1"]
+        second = await validator.validate_token(token)
+        assert validator._key_objects["k1"] is key_object
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first["sub"] == second["sub"] == "member"
+
+
+def test_healthz_get_and_head(client):
+    r = client.get("/healthz")
+    assert r.status_code == 200
+    assert r.text == "ok"
+    assert r.headers["cache-control"] == "no-store"
+    assert client.get("/healthz").text == "ok"
+
+    head = client.head("/healthz")
+    assert head.status_code == 200
+    assert head.content == b""
+
+
+def test_readyz_reports_ok_and_uptime(client):
+    r = client.get("/readyz")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    body = r.json()
+    assert body["ok"] is True
+    assert isinstance(body["uptime_s"], int) and body["uptime_s"] >= 0
+
+
+def test_app_logger_writes_json_from_queue_listener(monkeypatch):
+    import io
+    import json
+    import logging.handlers
+    import time
+
+    import app.main
+
+    assert isinstance(app.main.logger.handlers[0], logging.handlers.QueueHandler)
+    stream = io.StringIO()
+    monkeypatch.setattr(app.main._handler, "stream", stream)
+
+    app.main.logger.info("queued %s", "line")
+    deadline = time.monotonic() + 2
+    while not stream.getvalue() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    record = json.loads(stream.getvalue().splitlines()[0])
+    assert record["msg"] == "queued line"
+    assert record["logger"] == "app"
+
+
+def test_app_logger_never_emits_tracebacks(monkeypatch):
+    import io
+    import json
+    import time
+
+    import app.main
+
+    stream = io.StringIO()
+    monkeypatch.setattr(app.main._handler, "stream", stream)
+
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        app.main.logger.error("troubleshoot_error", exc_info=True, stack_info=True)
+    deadline = time.monotonic() + 2
+    while not stream.getvalue() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    out = stream.getvalue()
+    assert "Traceback" not in out and "ZeroDivisionError" not in out and "Stack" not in out
+    assert json.loads(out.splitlines()[0])["msg"] == "troubleshoot_error"
+
+
+def test_scored_checkin_body_matches_response_model(client):
+    from app.main import BAND_FOOTERS, BAND_REFLECTIONS, CheckInResponse
+
+    p = {
+        "user_id": "prerendered",
+        "adherence": 90,
+        "mood_trend": 0,
+        "cravings": 6,
+        "sleep_hours": 7.5,
+        "isolation": 10,
+    }
+    headers = {"user-agent": "prerendered-body-test"}
+    for _ in range(3):
+        r = client.post("/check-in", json=p, headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    body = r.json()
+    expected = CheckInResponse(
+        state="ok",
+        band="low",
+        score=body["score"],
+        reflection=BAND_REFLECTIONS["low"],
+        footer=BAND_FOOTERS["low"],
+    )
+    assert body == expected.model_dump()
+    assert r.content == expected.model_dump_json().encode()
+
+    schema = client.get("/openapi.json").json()
+    ok = schema["paths"]["/check-in"]["post"]["responses"]["200"]
+    assert ok["content"]["application/json"]["schema"]["$ref"].endswith("/CheckInResponse")
+
+
+class _StubRedis:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+
+    def register_script(self, source):
+        async def script(keys, args):
+            self.calls.append((keys, args))
+            if self.error:
+                raise self.error
+            return self.result
+
+        return script
+
+    async def aclose(self):
+        pass
+
+
+def test_redis_rate_limit_decision_is_used_when_configured(client, monkeypatch):
+    import app.main
+
+    stub = _StubRedis(result=0)
+    monkeypatch.setattr(
+        app.main, "REDIS_RATE_LIMIT", app.main.RedisRateLimiter(stub, app.main.RateLimitConfig())
+    )
+    r = client.post(
+        "/check-in",
+        json={
+            "user_id": "redis-limited",
+            "adherence": 80,
+            "mood_trend": 0,
+            "cravings": 10,
+            "sleep_hours": 8.0,
+            "isolation": 10,
+        },
+        headers={"user-agent": "redis-limit-test"},
+    )
+    assert r.status_code == 429
+    ((keys, args),) = stub.calls
+    assert keys[0].startswith(b"ratelimit:")
+    assert args == (5000, 2000, 10000)
+
+
+def test_redis_rate_limit_errors_fall_back_to_in_process(monkeypatch):
+    import asyncio
+
+    import app.main
+
+    stub = _StubRedis(error=ConnectionError("down"))
+    monkeypatch.setattr(
+        app.main, "REDIS_RATE_LIMIT", app.main.RedisRateLimiter(stub, app.main.RateLimitConfig())
+    )
+    fallback = app.main.InMemoryRateLimiter(app.main.RateLimitConfig(capacity=1))
+    monkeypatch.setattr(app.main, "RATE_LIMIT", fallback)
+
+    assert asyncio.run(app.main.check_rate_limit(b"k", 0)) is True
+    assert asyncio.run(app.main.check_rate_limit(b"k", 1)) is False
+    # Within the backoff Redis is not called again; after it, the next check retries.
+    assert len(stub.calls) == 1
+    retry_at = app.main.REDIS_RATE_LIMIT.retry_at_ns
+    assert retry_at == 5_000_000_000
+    stub.error = None
+    stub.result = 1
+    assert asyncio.run(app.main.check_rate_limit(b"k", retry_at)) is True
+    assert len(stub.calls) == 2
+
+
+def test_redis_token_bucket_script_matches_in_process_semantics():
+    import asyncio
+
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    from app.main import RateLimitConfig, RedisRateLimiter
+
+    async def run():
+        redis_client = fakeredis.aioredis.FakeRedis()
+        limiter = RedisRateLimiter(redis_client, RateLimitConfig(window_seconds=10, capacity=5))
+        burst = [await limiter.allow(b"k") for _ in range(6)]
+        state = await redis_client.hgetall("ratelimit:k")
+        # Rewind the refill clock by 2 s: exactly one token (0.5/s) comes back.
+        await redis_client.hset("ratelimit:k", "last", int(state[b"last"]) - 2_000_000)
+        after = [await limiter.allow(b"k"), await limiter.allow(b"k")]
+        ttl = await redis_client.pttl("ratelimit:k")
+        await limiter.close()
+        return burst, after, ttl
+
+    burst, after, ttl = asyncio.run(run())
+    assert burst == [True] * 5 + [False]
+    assert after == [True, False]
+    assert 0 < ttl <= 10_000
+
+
+def test_large_responses_are_gzipped_small_ones_are_not(client):
+    r = client.get("/help", headers={"accept-encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.json()["endpoints"]
+
+    r = client.get("/version", headers={"accept-encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+
+
+def test_json_responses_are_rendered_with_orjson(client):
+    import orjson
+
+    from app.main import ORJSONResponse, app, create_error_response
+
+    assert app.router.default_response_class is ORJSONResponse
+    err = create_error_response("not-found", "Missing", detail="café", code="E_X", status_code=404)
+    assert isinstance(err, ORJSONResponse)
+    assert err.body == orjson.dumps(orjson.loads(err.body))
+    assert "café".encode() in err.body
+
+    r = client.get("/version")
+    assert r.headers["content-type"] == "application/json"
+    assert r.content == orjson.dumps({"app_version": r.json()["app_version"]})
+
+
+def test_openapi_keeps_response_schemas_without_response_model(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    expected = {
+        ("/help", "get"): "HelpResponse",
+        ("/consents", "post"): "ConsentRecord",
+        ("/consents/{user_id}", "get"): "ConsentRecord",
+        ("/troubleshoot", "post"): "TroubleshootResponse",
+    }
+    for (path, method), model in expected.items():
+        ok = paths[path][method]["responses"]["200"]["content"]["application/json"]
+        assert ok["schema"]["$ref"].endswith("/" + model)
+
+
+def test_anon_key_is_stable_keyed_and_does_not_embed_inputs(monkeypatch):
+    import app.main
+
+    key = app.main.anon_key(b"203.0.113.7", b"ua/1.0")
+    assert key == app.main.anon_key(b"203.0.113.7", b"ua/1.0")
+    assert isinstance(key, bytes) and len(key) == 16
+    assert b"203.0.113.7" not in key
+    assert key != app.main.anon_key(b"203.0.113.7", b"ua/1.1")
+
+    monkeypatch.setattr(app.main, "_ANON_KEY", b"k" * 64)
+    assert app.main.anon_key(b"203.0.113.7", b"ua/1.0") != key
+
+
+def test_get_rate_key_reads_client_and_user_agent_from_scope():
+    from starlette.requests import Request
+
+    from app.main import anon_key, get_rate_key
+
+    def request(client, headers):
+        return Request({"type": "http", "client": client, "headers": headers})
+
+    r = request(("198.51.100.4", 5000), [(b"accept", b"*/*"), (b"user-agent", b"probe/2")])
+    assert get_rate_key(r) == anon_key(b"198.51.100.4", b"probe/2")
+    assert get_rate_key(request(None, [])) == anon_key(b"0.0.0.0", b"unknown")
+
+
+def test_v0_score_returns_band_with_its_text():
+    from app.main import BAND_FOOTERS, BAND_REFLECTIONS, CheckIn, v0_score
+
+    latest = CheckIn(
+        user_id="s", adherence=0, mood_trend=-10, cravings=90, sleep_hours=0, isolation=90
+    )
+    score, band, reflection, footer = v0_score([latest])
+    assert (score, band) == (100, "high")
+    assert reflection == BAND_REFLECTIONS["high"] and footer == BAND_FOOTERS["high"]
+
+
+def test_troubleshoot_knowledge_base_is_read_only():
+    from app.main import _TROUBLESHOOT_DB, generate_troubleshoot_steps
+
+    with pytest.raises(TypeError):
+        _TROUBLESHOOT_DB["login"] = _TROUBLESHOOT_DB["network"]  # type: ignore[index]
+    first = generate_troubleshoot_steps("login")
+    assert generate_troubleshoot_steps("login").steps == first.steps
+
+
+def test_troubleshoot_partial_match_picks_first_known_key():
+    from app.main import generate_troubleshoot_steps
+
+    assert generate_troubleshoot_steps("Network login glitch").identified_issue == (
+        "Authentication or login difficulties"
+    )
+    assert generate_troubleshoot_steps("consent form").identified_issue == (
+        "Problems with consent management"
+    )
+    assert generate_troubleshoot_steps("printer").identified_issue == (
+        "General technical difficulties"
+    )
+
+
+def test_help_and_version_are_served_from_prerendered_bytes(client):
+    from app.main import _HELP_BODY, _VERSION_BODY
+
+    r = client.get("/help")
+    assert r.content == _HELP_BODY and r.headers["content-type"] == "application/json"
+    r = client.get("/version")
+    assert r.content == _VERSION_BODY and r.json() == {"app_version": "0.0.1"}
+    schema = client.get("/openapi.json").json()["paths"]["/version"]["get"]["responses"]["200"]
+    assert schema["content"]["application/json"]["schema"]["type"] == "object"
+
+
+def test_checkin_scores_newest_entry_from_bounded_history(client):
+    from app.main import _SELECT_RECENT_HISTORY, MIN_CHECKINS_FOR_SCORE
+
+    assert _SELECT_RECENT_HISTORY._limit == MIN_CHECKINS_FOR_SCORE
+    calm = {"adherence": 95, "mood_trend": 0, "cravings": 0, "sleep_hours": 8.0, "isolation": 0}
+    risky = {"adherence": 0, "mood_trend": -10, "cravings": 90, "sleep_hours": 0, "isolation": 90}
+    headers = {"user-agent": "bounded-history-test"}
+    bands = [
+        client.post("/check-in", json={"user_id": "bounded", **p}, headers=headers)
+        .json()
+        .get("band")
+        for p in (calm, calm, calm, risky, calm)
+    ]
+    assert bands == [None, None, "low", "high", "low"]
+
+
+def test_iso_now_matches_datetime_isoformat(monkeypatch):
+    from datetime import datetime, timezone
+
+    import app.main
+
+    stamp_ns = 1_760_000_000_123_456_789
+    monkeypatch.setattr(app.main.time, "time_ns", lambda: stamp_ns)
+    expected = datetime.fromtimestamp(stamp_ns // 1000 / 1e6, tz=timezone.utc).isoformat()
+    assert app.main.iso_now() == expected
+    assert app.main.iso_now() == expected  # served from the per-second cache
+    monkeypatch.setattr(app.main.time, "time_ns", lambda: stamp_ns + 1_000_000_000)
+    assert app.main.iso_now().startswith(expected[:17] + "21.123456")
+
+    # On an exact second the fraction is still written, unlike datetime.isoformat().
+    monkeypatch.setattr(app.main.time, "time_ns", lambda: 1_760_000_005_000_000_000)
+    assert app.main.iso_now() == "2025-10-09T08:53:25.000000+00:00"
+    assert datetime.fromtimestamp(1_760_000_005, tz=timezone.utc).isoformat() == (
+        "2025-10-09T08:53:25+00:00"
+    )
+
+
+def test_troubleshoot_error_path_returns_static_fallback(client, monkeypatch):
+    import app.main
+
+    def boom(*_args, **_kwargs):
+        raise RuntimeError("generator failed")
+
+    monkeypatch.setattr(app.main, "_troubleshoot_body_tail", boom)
+    r = client.post("/troubleshoot", json={"issue_type": "login"})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["issue_type"] == "login"
+    assert body["identified_issue"] == "Technical difficulties encountered"
+    assert [s["title"] for s in body["steps"]] == ["Refresh and retry", "Contact support"]
+
+
+def test_troubleshoot_body_matches_model_serialization(client):
+    import orjson
+
+    from app.main import _match_troubleshoot_config, generate_troubleshoot_steps
+
+    for issue in ("login", "  Network Down ", "something else"):
+        r = client.post("/troubleshoot", json={"issue_type": issue})
+        assert r.status_code == 200
+        assert r.content == orjson.dumps(generate_troubleshoot_steps(issue).model_dump())
+    hits = _match_troubleshoot_config.cache_info().hits
+    client.post("/troubleshoot", json={"issue_type": "LOGIN"})
+    assert _match_troubleshoot_config.cache_info().hits > hits
+
+
+def test_constructed_response_models_serialize_like_validated_ones(client):
+    from app.main import ConsentRecord, ErrorResponse
+
+    r = client.post(
+        "/consents", json={"user_id": "construct", "terms_version": "v2", "accepted": True}
+    )
+    assert r.json() == ConsentRecord.model_validate(r.json()).model_dump()
+    r = client.get("/consents/construct")
+    assert r.json()["terms_version"] == "v2" and r.json()["accepted"] is True
+
+    r = client.get("/consents/nobody-here")
+    assert r.status_code == 404
+    body = r.json()
+    help_url = body.pop("help_url")
+    assert body == ErrorResponse.model_validate(body).model_dump()
+    assert body["status"] == "error" and body["error"]["help_url"] == help_url
+
+
+def test_rate_limit_messages_describe_burst_and_refill():
+    from app.main import HELP_TROUBLESHOOTING_GUIDANCE, RATE_LIMIT
+
+    cfg = RATE_LIMIT.cfg
+    burst, refill_every = cfg.capacity, cfg.window_seconds // cfg.capacity
+    guidance = HELP_TROUBLESHOOTING_GUIDANCE["rate_limited"]
+    assert f"burst of {burst} check-ins" in guidance
+    assert f"every {refill_every} seconds" in guidance